@@ -15,13 +15,291 @@ import json
 import tarfile
 import platform
 import shutil
+import gzip
+import zlib
+import tempfile
+import time
+import atexit
+import cProfile
+import shlex
+import threading
+import functools
+import pickle
+import ctypes
+import fcntl
+import struct
+import errno
+import mmap
+import pwd
+import getpass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from io import BytesIO
 from datetime import datetime
 
+# Files and directories in the home directory that are backed up by default.
+COMMON_FILES = [
+    'Documents', 'Pictures', 'Music', 'Downloads',
+    '.bashrc', '.vimrc', '.config', '.ssh'
+]
+
+# Per-file compression settings used by `create_backup`.
+COMPRESSION_PAX_KEY = 'DISTROHOP.compression'
+COMPRESSION_SUFFIX = '.gz'
+TRIAL_BLOCK_SIZE = 64 * 1024
+# A trial block must shrink to below this fraction of its size to be worth compressing.
+TRIAL_RATIO_THRESHOLD = 0.9
+# Chunk size for the mmap fallback of the zero-copy restore.
+MMAP_CHUNK_SIZE = 8 * 1024 * 1024
+
+# File extensions mapped to a content category for the manifest statistics.
+FILE_CATEGORIES = {
+    '.jpg': 'image', '.jpeg': 'image', '.png': 'image', '.gif': 'image',
+    '.webp': 'image', '.heic': 'image', '.avif': 'image',
+    '.mp3': 'audio', '.ogg': 'audio', '.opus': 'audio', '.flac': 'audio',
+    '.m4a': 'audio', '.aac': 'audio',
+    '.mp4': 'video', '.mkv': 'video', '.webm': 'video', '.avi': 'video',
+    '.mov': 'video', '.m4v': 'video',
+    '.zip': 'archive', '.gz': 'archive', '.tgz': 'archive', '.bz2': 'archive',
+    '.xz': 'archive', '.zst': 'archive', '.7z': 'archive', '.rar': 'archive',
+    '.iso': 'archive', '.deb': 'archive', '.rpm': 'archive', '.jar': 'archive',
+    '.txt': 'text', '.md': 'text', '.csv': 'text', '.json': 'text',
+    '.xml': 'text', '.html': 'text', '.conf': 'text', '.ini': 'text',
+    '.log': 'text', '.py': 'text', '.sh': 'text',
+    '.pdf': 'document', '.odt': 'document', '.ods': 'document',
+    '.docx': 'document', '.xlsx': 'document', '.pptx': 'document',
+}
+
+# Categories whose contents are already compressed and are always stored raw.
+INCOMPRESSIBLE_CATEGORIES = {'image', 'audio', 'video', 'archive'}
+
+# Leading bytes of common compressed formats, used when the extension is not conclusive.
+MAGIC_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image'),               # JPEG
+    (b'\x89PNG\r\n\x1a\n', 'image'),          # PNG
+    (b'GIF8', 'image'),
+    (b'ID3', 'audio'),                        # MP3 with ID3 tag
+    (b'OggS', 'audio'),
+    (b'fLaC', 'audio'),
+    (b'\x1aE\xdf\xa3', 'video'),              # Matroska / WebM
+    (b'PK\x03\x04', 'archive'),               # zip and zip-based formats
+    (b'\x1f\x8b', 'archive'),                  # gzip
+    (b'BZh', 'archive'),
+    (b'\xfd7zXZ\x00', 'archive'),              # xz
+    (b'\x28\xb5\x2f\xfd', 'archive'),          # zstd
+    (b'7z\xbc\xaf\x27\x1c', 'archive'),
+    (b'Rar!', 'archive'),
+]
+
+# Background (throttled) export settings.
+BACKGROUND_NICE = 10
+BACKGROUND_IO_LIMIT = 20 * 1024 * 1024        # bytes/s read from the source disk
+BACKGROUND_COMPRESS_LIMIT = 10 * 1024 * 1024  # bytes/s fed through gzip
+# Back off when PSI "some avg10" exceeds PRESSURE_HIGH (%) or the load per CPU exceeds
+# LOAD_HIGH, and speed up again once both drop below the low marks.
+PRESSURE_HIGH = 20.0
+PRESSURE_LOW = 5.0
+LOAD_HIGH = 1.0
+LOAD_LOW = 0.5
+THROTTLE_MIN_SCALE = 0.05
+THROTTLE_CHECK_INTERVAL = 1.0
+
+# Multi-user backups: parallel archive writers share one bandwidth budget.
+MULTI_USER_WORKERS = 4
+MULTI_USER_BANDWIDTH = 80 * 1024 * 1024  # bytes/s across all writers
+MULTI_USER_LABEL_PREFIX = 'user-'
+
+# Cached package files can be bundled into the backup for offline reinstall.
+PACKAGE_BUNDLE_DIR = 'distrohop-packages'
+PACKAGE_CACHE_DIRS = {
+    'apt': ['/var/cache/apt/archives'],
+    'pacman': ['/var/cache/pacman/pkg'],
+    'dnf': ['/var/cache/dnf', '/var/cache/libdnf5'],
+    'yum': ['/var/cache/yum'],
+    'zypper': ['/var/cache/zypp/packages'],
+}
+PACKAGE_FILE_SUFFIXES = {
+    'apt': ('.deb',),
+    'pacman': ('.pkg.tar.zst', '.pkg.tar.xz'),
+    'dnf': ('.rpm',),
+    'yum': ('.rpm',),
+    'zypper': ('.rpm',),
+}
+# Install local package files without refreshing repository metadata.
+LOCAL_INSTALL_COMMANDS = {
+    'apt': ['sudo', 'apt', 'install', '-y'],
+    'pacman': ['sudo', 'pacman', '-U', '--noconfirm', '--needed'],
+    'dnf': ['sudo', 'dnf', 'install', '-y', '--cacheonly'],
+    'yum': ['sudo', 'yum', 'install', '-y', '--cacheonly'],
+    'zypper': ['sudo', 'zypper', '--no-refresh', 'install', '-y'],
+}
+
+# Bulk queries used by the installation planner: one call lists every package
+# installed through (or available to) a package manager.
+INSTALLED_QUERIES = {
+    'apt': ['dpkg-query', '-W', '-f=${db:Status-Abbrev} ${Package}\n'],
+    'dnf': ['rpm', '-qa', '--qf', '%{NAME}\n'],
+    'yum': ['rpm', '-qa', '--qf', '%{NAME}\n'],
+    'zypper': ['rpm', '-qa', '--qf', '%{NAME}\n'],
+    'pacman': ['pacman', '-Qq'],
+    'flatpak': ['flatpak', 'list', '--columns=application,name'],
+}
+AVAILABLE_QUERIES = {
+    'apt': ['apt-cache', 'pkgnames'],
+    'dnf': ['dnf', 'repoquery', '--quiet', '--qf', '%{name}\n'],
+    'yum': ['repoquery', '--quiet', '--qf', '%{name}'],
+    'pacman': ['pacman', '-Slq'],
+    'flatpak': ['flatpak', 'remote-ls', '--columns=application,name', 'flathub'],
+}
+# Architecture suffixes dnf/yum append to installed package names (name.arch).
+ARCH_SUFFIXES = {'x86_64', 'i686', 'i386', 'noarch', 'aarch64', 'armv7hl', 'ppc64le', 's390x'}
+
+# Change journal kept by the watcher (`--watch`) so exports can skip the full rescan.
+JOURNAL_DIR = os.path.join('.local', 'state', 'distrohop')  # relative to the home directory
+JOURNAL_LOG = 'journal.log'        # one JSON [op, path] per line, op is "C"hanged or "D"eleted
+WATCHER_STATE = 'watcher.json'     # written only by the watcher
+JOURNAL_BASE = 'base.json'         # written only by export: the backup the journal is relative to
+# inotify(7) event flags.
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_ONLYDIR | IN_DONT_FOLLOW)
+INOTIFY_EVENT = struct.Struct('iIII')
+
+# Opt-in tracing: DISTROHOP_TRACE=<file.json> writes a Chrome trace-event timeline
+# (open it in chrome://tracing or Perfetto); DISTROHOP_PROFILE=<span name> also runs
+# cProfile over that phase and writes <file.json>.<span name>.prof next to it.
+TRACE_ENV = 'DISTROHOP_TRACE'
+PROFILE_ENV = 'DISTROHOP_PROFILE'
+# Per-file spans shorter than this (microseconds) are only counted in the totals.
+TRACE_MIN_FILE_SPAN = 1000
+
+class Tracer:
+    """
+    Collects timed spans and writes them as a Chrome trace-event JSON file.
+    """
+
+    def __init__(self, path, profile_phase=None):
+        self.path = path
+        self.profile_phase = profile_phase
+        self.events = []
+        self.totals = {}
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+
+    def now(self):
+        """Microseconds since the tracer was created."""
+        return (time.perf_counter() - self.start) * 1e6
+
+    @contextmanager
+    def span(self, name, category='phase', min_duration=0, **args):
+        """
+        Time the enclosed block. Yields the span's args dict so callers can attach
+        results (exit codes, byte counts) before the span closes.
+        """
+        profiler = None
+        if name == self.profile_phase:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # Another span of the same phase is already being profiled
+                profiler = None
+        begin = self.now()
+        try:
+            yield args
+        finally:
+            duration = self.now() - begin
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(f"{self.path}.{name}.prof")
+            with self.lock:
+                total = self.totals.setdefault(name, {'count': 0, 'seconds': 0.0, 'bytes': 0})
+                total['count'] += 1
+                total['seconds'] += duration / 1e6
+                total['bytes'] += args.get('bytes') or 0
+                if duration >= min_duration:
+                    self.events.append({
+                        'name': name, 'cat': category, 'ph': 'X',
+                        'ts': begin, 'dur': duration,
+                        'pid': os.getpid(), 'tid': threading.get_ident(),
+                        'args': args
+                    })
+
+    def save(self):
+        """Write the collected spans to the trace file."""
+        with self.lock:
+            trace = {
+                'traceEvents': self.events,
+                'displayTimeUnit': 'ms',
+                'otherData': {'totals': self.totals}
+            }
+            try:
+                with open(self.path, 'w') as f:
+                    json.dump(trace, f, default=str)
+            except OSError as e:
+                print(f"Error writing trace file: {e}")
+
+def init_tracer():
+    """Create the global tracer if tracing was requested through the environment."""
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        return None
+    tracer = Tracer(path, os.environ.get(PROFILE_ENV))
+    atexit.register(tracer.save)
+    return tracer
+
+TRACER = init_tracer()
+
+def trace_span(name, category='phase', min_duration=0, **args):
+    """
+    Return a span context manager, or a no-op one yielding a throwaway dict when
+    tracing is disabled.
+    """
+    if TRACER is None:
+        return nullcontext(args)
+    return TRACER.span(name, category, min_duration, **args)
+
+def traced(func):
+    """Decorator recording each call of `func` as a span named after it."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if TRACER is None:
+            return func(*args, **kwargs)
+        with TRACER.span(func.__name__, 'phase', args=[str(a)[:200] for a in args]):
+            return func(*args, **kwargs)
+    return wrapper
+
+def run_command(cmd, **kwargs):
+    """
+    Wrapper around `subprocess.run` that records the command, exit code and output
+    size as a trace span when tracing is enabled.
+    """
+    if TRACER is None:
+        return subprocess.run(cmd, **kwargs)
+    with TRACER.span(os.path.basename(cmd[0]), 'subprocess', command=shlex.join(cmd)) as span:
+        try:
+            result = subprocess.run(cmd, **kwargs)
+        except subprocess.CalledProcessError as e:
+            span['exit_code'] = e.returncode
+            raise
+        span['exit_code'] = result.returncode
+        span['bytes'] = sum(len(out) for out in (result.stdout, result.stderr) if out)
+        return result
+
 def clear_screen():
     """Clear the terminal screen."""
     os.system('clear' if os.name == 'posix' else 'cls')
 
+@traced
 def get_usb_drives():
     """
     Detect USB drives using `lsblk -J`.
@@ -29,7 +307,7 @@ def get_usb_drives():
     """
     try:
         # Request specific columns for clarity
-        result = subprocess.run(
+        result = run_command(
             ['lsblk', '-J', '-o', 'NAME,LABEL,RM,MOUNTPOINT,SIZE'],
             capture_output=True, text=True, check=True
         )
@@ -68,16 +346,61 @@ def get_free_space(path):
     except Exception:
         return "Unknown"
 
-def get_common_files():
+def get_common_files(home=None):
+    """
+    Returns a list of common directories and files (if they exist) in the user's home directory,
+    or in `home` if given.
+    """
+    home = home or os.path.expanduser('~')
+    return [os.path.join(home, f) for f in COMMON_FILES if os.path.exists(os.path.join(home, f))]
+
+def get_uid_range():
+    """
+    Return the (UID_MIN, UID_MAX) range of regular users from /etc/login.defs.
+    """
+    uid_min, uid_max = 1000, 60000
+    try:
+        with open('/etc/login.defs') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == 'UID_MIN':
+                    uid_min = int(fields[1])
+                elif len(fields) >= 2 and fields[0] == 'UID_MAX':
+                    uid_max = int(fields[1])
+    except (OSError, ValueError):
+        pass
+    return uid_min, uid_max
+
+def get_user_homes():
     """
-    Returns a list of common directories and files (if they exist) in the user's home directory.
+    Find the home directories of all real (non-system) users.
+    Uses the passwd database within the regular UID range, plus any directory in /home
+    owned by a regular user who has no passwd home (e.g. left over from a deleted account).
+    Returns a list of {'user', 'home'} dicts.
     """
-    home = os.path.expanduser('~')
-    common = [
-        'Documents', 'Pictures', 'Music', 'Downloads',
-        '.bashrc', '.vimrc', '.config', '.ssh'
-    ]
-    return [os.path.join(home, f) for f in common if os.path.exists(os.path.join(home, f))]
+    uid_min, uid_max = get_uid_range()
+    users = {}
+    uids_with_home = set()
+    for entry in pwd.getpwall():
+        if uid_min <= entry.pw_uid <= uid_max and os.path.isdir(entry.pw_dir):
+            users[entry.pw_dir] = entry.pw_name
+            uids_with_home.add(entry.pw_uid)
+    try:
+        for name in sorted(os.listdir('/home')):
+            path = os.path.join('/home', name)
+            if name == 'lost+found' or path in users or os.path.islink(path) or not os.path.isdir(path):
+                continue
+            # Shared or system-owned directories are not anyone's home.
+            uid = os.stat(path).st_uid
+            if uid in uids_with_home or not uid_min <= uid <= uid_max:
+                continue
+            try:
+                users[path] = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                users[path] = name
+    except OSError:
+        pass
+    return [{'user': user, 'home': home} for home, user in sorted(users.items())]
 
 def detect_package_managers():
     """
@@ -85,12 +408,13 @@ def detect_package_managers():
     """
     managers = []
     for pm in ['apt', 'dnf', 'yum', 'pacman', 'zypper']:
-        if subprocess.run(['which', pm], capture_output=True).returncode == 0:
+        if run_command(['which', pm], capture_output=True).returncode == 0:
             managers.append(pm)
-    if subprocess.run(['which', 'flatpak'], capture_output=True).returncode == 0:
+    if run_command(['which', 'flatpak'], capture_output=True).returncode == 0:
         managers.append('flatpak')
     return managers
 
+@traced
 def get_installed_apps():
     """
     Attempt to retrieve a list of installed applications from various package managers.
@@ -100,7 +424,7 @@ def get_installed_apps():
     
     if 'apt' in managers:
         try:
-            result = subprocess.run(
+            result = run_command(
                 ['apt', 'list', '--installed'],
                 capture_output=True, text=True, check=True
             )
@@ -111,7 +435,7 @@ def get_installed_apps():
     if 'dnf' in managers or 'yum' in managers:
         pm = 'dnf' if 'dnf' in managers else 'yum'
         try:
-            result = subprocess.run(
+            result = run_command(
                 [pm, 'list', 'installed'],
                 capture_output=True, text=True, check=True
             )
@@ -122,7 +446,7 @@ def get_installed_apps():
 
     if 'pacman' in managers:
         try:
-            result = subprocess.run(
+            result = run_command(
                 ['pacman', '-Q'],
                 capture_output=True, text=True, check=True
             )
@@ -132,7 +456,7 @@ def get_installed_apps():
 
     if 'flatpak' in managers:
         try:
-            result = subprocess.run(
+            result = run_command(
                 ['flatpak', 'list'],
                 capture_output=True, text=True, check=True
             )
@@ -142,28 +466,471 @@ def get_installed_apps():
 
     return list(set(apps))  # Remove duplicates
 
-def create_backup(selected_files, apps_list, destination):
+def read_pressure(resource):
+    """
+    Return the "some avg10" stall percentage from /proc/pressure/<resource>,
+    or None if pressure stall information is not available.
+    """
+    try:
+        with open(f'/proc/pressure/{resource}') as f:
+            for line in f:
+                if line.startswith('some'):
+                    fields = dict(field.split('=') for field in line.split()[1:])
+                    return float(fields['avg10'])
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+def apply_background_priority():
+    """
+    Lower the CPU and I/O scheduling priority of this process so the desktop stays responsive.
+    """
+    try:
+        os.nice(BACKGROUND_NICE)
+    except OSError:
+        pass
+    # Best-effort class, lowest priority; ionice may not be installed.
+    try:
+        run_command(['ionice', '-c', '2', '-n', '7', '-p', str(os.getpid())], capture_output=True)
+    except OSError:
+        pass
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Run `func` in a forked child process at background priority and return its result.
+    The lowered CPU/I/O priority stays with the child, so this interactive process (and
+    later installs started from it) keeps its normal priority.
+    Raises RuntimeError if the child fails.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 0
+        try:
+            if TRACER is not None:
+                # The child writes its own spans next to the parent's trace file.
+                root, ext = os.path.splitext(TRACER.path)
+                TRACER.path = f"{root}.background-{os.getpid()}{ext}"
+                TRACER.events, TRACER.totals = [], {}
+            apply_background_priority()
+            outcome = ('ok', func(*args, **kwargs))
+        except BaseException as e:
+            outcome = ('error', str(e))
+            status = 1
+        try:
+            with os.fdopen(write_fd, 'wb') as pipe:
+                pickle.dump(outcome, pipe)
+            if TRACER is not None:
+                TRACER.save()
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as pipe:
+        data = pipe.read()
+    os.waitpid(pid, 0)
+    if not data:
+        raise RuntimeError("background export process exited unexpectedly")
+    kind, value = pickle.loads(data)
+    if kind == 'error':
+        raise RuntimeError(value)
+    return value
+
+class TokenBucket:
+    """
+    Simple token-bucket rate limiter; one token is one byte.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.last = time.monotonic()
+        # Shared by parallel writers; waiting under the lock queues them fairly.
+        self.lock = threading.Lock()
+
+    def consume(self, amount):
+        """Take `amount` tokens, sleeping until they are available."""
+        with self.lock:
+            self._consume(amount)
+
+    def _consume(self, amount):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            # Requests larger than the burst are allowed to drive the bucket negative.
+            if self.tokens >= min(amount, self.burst):
+                self.tokens -= amount
+                return
+            time.sleep((min(amount, self.burst) - self.tokens) / self.rate)
+
+class BackgroundThrottle:
+    """
+    Limits read and compress throughput of an export and, when `adaptive`, adapts the
+    limits to system load and foreground CPU/I/O pressure. A `compress_rate` of None
+    leaves compression unlimited. One instance may be shared between threads.
+    """
+
+    def __init__(self, io_rate=BACKGROUND_IO_LIMIT, compress_rate=BACKGROUND_COMPRESS_LIMIT, adaptive=True):
+        self.io_rate = io_rate
+        self.compress_rate = compress_rate
+        self.adaptive = adaptive
+        self.read_bucket = TokenBucket(io_rate)
+        self.compress_bucket = TokenBucket(compress_rate) if compress_rate else None
+        self.scale = 1.0
+        self.last_check = 0.0
+        self.lock = threading.Lock()
+
+    def system_busy(self):
+        """Return True if the system is under pressure, False if idle, None if in between."""
+        pressure = max((p for p in (read_pressure('io'), read_pressure('cpu')) if p is not None), default=None)
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        if (pressure is not None and pressure > PRESSURE_HIGH) or load > LOAD_HIGH:
+            return True
+        if (pressure is None or pressure < PRESSURE_LOW) and load < LOAD_LOW:
+            return False
+        return None
+
+    def adjust(self):
+        """Re-evaluate system pressure at most once per THROTTLE_CHECK_INTERVAL."""
+        now = time.monotonic()
+        with self.lock:
+            if not self.adaptive or now - self.last_check < THROTTLE_CHECK_INTERVAL:
+                return
+            self.last_check = now
+        busy = self.system_busy()
+        if busy:
+            self.scale = max(THROTTLE_MIN_SCALE, self.scale / 2)
+        elif busy is False:
+            self.scale = min(1.0, self.scale * 1.25)
+        self.read_bucket.rate = self.io_rate * self.scale
+        if self.compress_bucket:
+            self.compress_bucket.rate = self.compress_rate * self.scale
+
+    def wait(self, amount, compress=False):
+        """Block until `amount` bytes may be read (and compressed)."""
+        self.adjust()
+        self.read_bucket.consume(amount)
+        if compress and self.compress_bucket:
+            self.compress_bucket.consume(amount)
+
+class ThrottledReader:
+    """
+    File wrapper whose reads are paced by a BackgroundThrottle.
+    """
+
+    def __init__(self, fileobj, throttle, compress=False):
+        self.fileobj = fileobj
+        self.throttle = throttle
+        self.compress = compress
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        if data:
+            self.throttle.wait(len(data), self.compress)
+        return data
+
+def classify_file(path):
     """
-    Create a compressed tar.gz backup containing the selected files and a manifest
-    listing the applications and other metadata.
+    Decide whether a regular file is worth compressing.
+    Uses the extension first, then the magic bytes and finally a quick trial
+    compression of the first block. Returns (category, compress).
     """
+    category = FILE_CATEGORIES.get(os.path.splitext(path)[1].lower(), 'other')
+    if category in INCOMPRESSIBLE_CATEGORIES:
+        return category, False
+
+    with open(path, 'rb') as f:
+        block = f.read(TRIAL_BLOCK_SIZE)
+    if not block:
+        return category, False
+
+    for signature, magic_category in MAGIC_SIGNATURES:
+        if block.startswith(signature):
+            return (magic_category if category == 'other' else category), False
+    if block[4:8] == b'ftyp':  # MP4 / QuickTime containers
+        return ('video' if category == 'other' else category), False
+
+    ratio = len(zlib.compress(block, 1)) / len(block)
+    return category, ratio < TRIAL_RATIO_THRESHOLD
+
+def is_within(path, roots):
+    """Return True if `path` is one of `roots` or lies below one of them."""
+    return any(path == root or path.startswith(root + os.sep) for root in roots)
+
+def iter_changed_paths(changed_paths, selected_files):
+    """
+    Yield the journaled paths that still exist below the selected files/directories,
+    parents before children.
+    """
+    for path in sorted(changed_paths):
+        if is_within(path, selected_files) and os.path.lexists(path):
+            yield path
+
+def iter_backup_paths(selected_files):
+    """
+    Yield every path below the selected files/directories, parents before children.
+    Symlinks are yielded but never followed.
+    """
+    for path in selected_files:
+        if not os.path.lexists(path):
+            continue
+        yield path
+        if os.path.islink(path) or not os.path.isdir(path):
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in dirs:
+                yield os.path.join(root, name)
+            for name in sorted(files):
+                yield os.path.join(root, name)
+
+def add_file_adaptive(tar, path, arcname, stats, throttle=None, store=False, compressed_inodes=None):
+    """
+    Add a single path to `tar`. Regular files that compress well are stored
+    gzip-compressed (with a `.gz` suffix and a PAX marker), everything else raw.
+    With `store`, every file is stored raw without classification.
+    Updates the per-category `stats` dictionary in place. Reads are paced by
+    `throttle` when one is given. `compressed_inodes` maps the inodes of compressed
+    files to their member names, so later hard links to them are marked compressed too.
+    """
+    if compressed_inodes is None:
+        compressed_inodes = {}
+    info = tar.gettarinfo(path, arcname=arcname)
+    if info is None:  # Sockets, devices and other unsupported file types
+        return
+    st = os.lstat(path)
+    if info.islnk() and (st.st_ino, st.st_dev) in compressed_inodes:
+        # Link to a compressed member: keep the .gz naming so restore strips both sides.
+        info.name = arcname + COMPRESSION_SUFFIX
+        info.linkname = compressed_inodes[(st.st_ino, st.st_dev)]
+        info.pax_headers = {COMPRESSION_PAX_KEY: 'gzip'}
+    if not info.isreg():
+        tar.addfile(info)
+        return
+
+    if store:
+        category, compress = FILE_CATEGORIES.get(os.path.splitext(path)[1].lower(), 'other'), False
+    else:
+        with trace_span('classify', 'file', TRACE_MIN_FILE_SPAN, path=arcname):
+            category, compress = classify_file(path)
+    entry = stats.setdefault(category, {
+        'files': 0, 'stored_raw': 0, 'original_bytes': 0, 'stored_bytes': 0
+    })
+    entry['files'] += 1
+    entry['original_bytes'] += info.size
+
+    with open(path, 'rb') as src:
+        if compress:
+            with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as tmp:
+                reader = ThrottledReader(src, throttle, compress=True) if throttle else src
+                with trace_span('compress', 'file', TRACE_MIN_FILE_SPAN, path=arcname, bytes=info.size):
+                    with gzip.GzipFile(fileobj=tmp, mode='wb', compresslevel=6, mtime=0) as gz:
+                        shutil.copyfileobj(reader, gz)
+                compressed_size = tmp.tell()
+                # The trial block can be misleading; never store a larger copy.
+                if compressed_size < info.size:
+                    tmp.seek(0)
+                    info.name = arcname + COMPRESSION_SUFFIX
+                    info.size = compressed_size
+                    info.pax_headers = {COMPRESSION_PAX_KEY: 'gzip'}
+                    # Later hard links must point at the renamed, compressed member.
+                    tar.inodes[(st.st_ino, st.st_dev)] = info.name
+                    compressed_inodes[(st.st_ino, st.st_dev)] = info.name
+                    with trace_span('usb_write', 'file', TRACE_MIN_FILE_SPAN, path=arcname, bytes=compressed_size):
+                        tar.addfile(info, fileobj=tmp)
+                    entry['stored_bytes'] += compressed_size
+                    return
+            src.seek(0)
+        with trace_span('usb_write', 'file', TRACE_MIN_FILE_SPAN, path=arcname, bytes=info.size):
+            tar.addfile(info, fileobj=ThrottledReader(src, throttle) if throttle else src)
+        entry['stored_raw'] += 1
+        entry['stored_bytes'] += info.size
+
+def strip_arch_suffix(app):
+    """
+    Return `app` without a dnf/yum architecture suffix (name.arch); other dotted
+    names such as python3.11 are returned unchanged.
+    """
+    base, _, suffix = app.rpartition('.')
+    return base if base and suffix in ARCH_SUFFIXES else app
+
+def package_name_from_file(package_manager, filename):
+    """
+    Return the package name encoded in a cached package file name.
+    """
+    if package_manager == 'apt':
+        return filename.split('_')[0]             # name_version_arch.deb
+    if package_manager == 'pacman':
+        return filename.rsplit('-', 3)[0]         # name-version-release-arch.pkg.tar.zst
+    return filename.rsplit('-', 2)[0]             # name-version-release.arch.rpm
+
+@traced
+def collect_cached_packages(package_manager, apps_list):
+    """
+    Find cached package files for the packages in `apps_list`.
+    Returns {package name: file path}, keeping only the newest file per package.
+    """
+    wanted = set(apps_list) | {strip_arch_suffix(app) for app in apps_list}  # dnf lists name.arch
+    found = {}
+    for cache_dir in PACKAGE_CACHE_DIRS.get(package_manager, []):
+        for root, _, files in os.walk(cache_dir):
+            for name in files:
+                if not name.endswith(PACKAGE_FILE_SUFFIXES[package_manager]):
+                    continue
+                package = package_name_from_file(package_manager, name)
+                if package not in wanted:
+                    continue
+                path = os.path.join(root, name)
+                if package not in found or os.path.getmtime(path) > os.path.getmtime(found[package]):
+                    found[package] = path
+    return found
+
+def generate_repo_metadata(package_manager, repo_dir, filenames):
+    """
+    Generate native repository metadata for the package files in `repo_dir`, if the
+    tool for it is installed. Returns the generated paths relative to `repo_dir`.
+    """
+    try:
+        if package_manager == 'apt' and shutil.which('dpkg-scanpackages'):
+            result = run_command(['dpkg-scanpackages', '--multiversion', '.', '/dev/null'],
+                                 cwd=repo_dir, capture_output=True, check=True)
+            with open(os.path.join(repo_dir, 'Packages'), 'wb') as f:
+                f.write(result.stdout)
+        elif package_manager == 'pacman' and shutil.which('repo-add'):
+            run_command(['repo-add', '-q', 'distrohop.db.tar.gz', *filenames],
+                        cwd=repo_dir, capture_output=True, check=True)
+        elif package_manager in ['dnf', 'yum', 'zypper'] and (shutil.which('createrepo_c') or shutil.which('createrepo')):
+            tool = shutil.which('createrepo_c') or shutil.which('createrepo')
+            run_command([tool, '.'], cwd=repo_dir, capture_output=True, check=True)
+        else:
+            return []
+    except (OSError, subprocess.CalledProcessError):
+        return []
+
+    generated = []
+    for root, _, files in os.walk(repo_dir):
+        for name in files:
+            rel = os.path.relpath(os.path.join(root, name), repo_dir)
+            if rel not in filenames:
+                generated.append(rel)
+    return sorted(generated)
+
+def add_package_bundle(tar, apps_list, stats, throttle=None, store=False, compressed_inodes=None):
+    """
+    Add the cached package files of the packages in `apps_list` to `tar` as a local
+    repository under PACKAGE_BUNDLE_DIR/<package manager>/, with generated metadata.
+    Returns the manifest entry describing the bundle, or None if nothing was bundled.
+    """
+    package_manager = next((pm for pm in detect_package_managers() if pm in PACKAGE_CACHE_DIRS), None)
+    if package_manager is None:
+        return None
+    packages = collect_cached_packages(package_manager, apps_list)
+    if not packages:
+        return None
+
+    bundle_dir = f"{PACKAGE_BUNDLE_DIR}/{package_manager}"
+    files = {}
+    # Metadata tools run over a directory of symlinks so the packages are not copied.
+    with tempfile.TemporaryDirectory() as repo_dir:
+        for package, path in sorted(packages.items()):
+            filename = os.path.basename(path)
+            os.symlink(path, os.path.join(repo_dir, filename))
+            add_file_adaptive(tar, path, f"{bundle_dir}/{filename}", stats, throttle, store,
+                              compressed_inodes)
+            files[package] = filename
+        metadata = generate_repo_metadata(package_manager, repo_dir, sorted(files.values()))
+        for rel in metadata:
+            add_file_adaptive(tar, os.path.join(repo_dir, rel), f"{bundle_dir}/{rel}", stats, throttle, store,
+                              compressed_inodes)
+    return {'package_manager': package_manager, 'packages': files, 'metadata': metadata}
+
+@traced
+def install_bundled_packages(backup_file, bundle):
+    """
+    Install the package files bundled in a backup in a single local transaction,
+    without downloading anything. Returns the names of the installed packages.
+    """
+    package_manager = bundle['package_manager']
+    with tempfile.TemporaryDirectory() as repo_dir:
+        extract_backup(backup_file, repo_dir, package_bundle=True)
+        paths = [os.path.join(repo_dir, PACKAGE_BUNDLE_DIR, package_manager, f)
+                 for f in bundle['packages'].values()]
+        try:
+            run_command(LOCAL_INSTALL_COMMANDS[package_manager] + paths, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return []
+    return list(bundle['packages'])
+
+@traced
+def create_backup(selected_files, apps_list, destination, background=False,
+                  home=None, user=None, throttle=None, bundle_packages=False, store=False,
+                  changes=None, timestamp=None):
+    """
+    Create a tar backup containing the selected files and a manifest listing the
+    applications and other metadata. Each file is compressed individually, and
+    already-compressed content (photos, music, archives...) is stored as-is.
+    With `background`, throughput is throttled and backs off under system load; run the
+    call through `run_in_background` to also lower its CPU/I/O priority.
+    `home` and `user` select whose home directory is archived (default: the current
+    user); `throttle` lets several backups share one bandwidth budget. With
+    `bundle_packages`, cached package files of the listed apps are included too.
+    With `store`, nothing is compressed, which allows the zero-copy restore path.
+    `changes` is a journal from `read_change_journal`; only the paths it lists are
+    archived, and the deletions are recorded in the manifest. `timestamp` overrides
+    the one in the archive name, so the archives of one multi-user export match.
+    """
+    home = home or os.path.expanduser('~')
     manifest = {
         'created': datetime.now().isoformat(),
         'files': selected_files,
         'apps': apps_list,
-        'system': platform.platform()
+        'system': platform.platform(),
+        'user': user or getpass.getuser(),
+        'home': home,
+        'compression_mode': 'store' if store else 'adaptive'
     }
-    backup_name = f"migration_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.tar.gz"
+    # The home's basename keeps the names unique if one user owns several homes.
+    label = f"{MULTI_USER_LABEL_PREFIX}{user}@{os.path.basename(home)}_" if user else ''
+    if changes:
+        label += 'incremental_'
+        manifest['incremental'] = {
+            'base': changes['base'],
+            'deleted': [os.path.relpath(p, home) for p in changes['deleted'] if is_within(p, selected_files)]
+        }
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    backup_name = f"migration_backup_{label}{timestamp}.tar"
     backup_path = os.path.join(destination, backup_name)
 
+    if background:
+        throttle = throttle or BackgroundThrottle()
+
     try:
-        with tarfile.open(backup_path, "w:gz") as tar:
+        stats = {}
+        compressed_inodes = {}
+        with tarfile.open(backup_path, "w", format=tarfile.PAX_FORMAT) as tar:
             # Add each file/directory preserving relative path from the home directory.
-            home = os.path.expanduser('~')
-            for file in selected_files:
-                if os.path.exists(file):
-                    arcname = os.path.relpath(file, home)
-                    tar.add(file, arcname=arcname)
+            if changes:
+                paths = iter_changed_paths(changes['changed'], selected_files)
+            else:
+                paths = iter_backup_paths(selected_files)
+            while True:
+                with trace_span('tar_walk', 'file', TRACE_MIN_FILE_SPAN):
+                    path = next(paths, None)
+                if path is None:
+                    break
+                add_file_adaptive(tar, path, os.path.relpath(path, home), stats, throttle, store,
+                                  compressed_inodes)
+            if bundle_packages:
+                with trace_span('bundle_packages'):
+                    manifest['package_bundle'] = add_package_bundle(tar, apps_list, stats, throttle, store,
+                                                                   compressed_inodes)
+            for entry in stats.values():
+                saved = entry['original_bytes'] - entry['stored_bytes']
+                entry['ratio_saved'] = round(saved / entry['original_bytes'], 4) if entry['original_bytes'] else 0.0
+            manifest['compression'] = stats
             # Write manifest.json directly into the archive without a temporary file.
             manifest_data = json.dumps(manifest, indent=4)
             manifest_bytes = manifest_data.encode('utf-8')
@@ -175,49 +942,608 @@ def create_backup(selected_files, apps_list, destination):
     except Exception as e:
         return False, str(e)
 
+def is_uncompressed_tar(backup_file):
+    """
+    Return True if the archive is a plain (not whole-file compressed) tar, whose
+    member data can be copied straight out of the file.
+    """
+    with open(backup_file, 'rb') as f:
+        return f.read(262)[257:262] == b'ustar'
+
+def copy_member_data(src_fd, dst_fd, offset, size):
+    """
+    Copy `size` bytes starting at `offset` of `src_fd` to `dst_fd` in the kernel
+    using copy_file_range or sendfile, falling back to writing mmap slices.
+    """
+    copied = 0
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                n = os.copy_file_range(src_fd, dst_fd, size - copied, offset + copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+    if copied < size and hasattr(os, 'sendfile'):
+        try:
+            while copied < size:
+                n = os.sendfile(dst_fd, src_fd, offset + copied, size - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError as e:
+            if e.errno not in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+    while copied < size:
+        # mmap offsets must be aligned to the allocation granularity.
+        start = offset + copied
+        aligned = start - start % mmap.ALLOCATIONGRANULARITY
+        length = min(MMAP_CHUNK_SIZE, size - copied)
+        with mmap.mmap(src_fd, start - aligned + length, offset=aligned, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)[start - aligned:]
+            try:
+                written = 0
+                while written < length:
+                    written += os.write(dst_fd, view[written:])
+            finally:
+                view.release()
+        copied += length
+
+def prepare_target(destination, name):
+    """
+    Return the path to write member `name` to below `destination`, creating its parent
+    directories and removing any existing non-directory entry. Refuses paths that escape
+    `destination`.
+    """
+    path = os.path.join(destination, name)
+    parent = os.path.realpath(os.path.dirname(path))
+    if parent != destination and not parent.startswith(destination + os.sep):
+        raise ValueError(f"Refusing to extract outside destination: {name}")
+    os.makedirs(parent, exist_ok=True)
+    target = os.path.join(parent, os.path.basename(path))
+    if os.path.lexists(target) and not os.path.isdir(target):
+        os.unlink(target)
+    return target
+
+def apply_member_metadata(tar, member, target):
+    """
+    Restore ownership (when running as root), permissions and mtime of an extracted member.
+    """
+    if os.geteuid() == 0:
+        tar.chown(member, target, numeric_owner=False)
+    os.chmod(target, member.mode)
+    os.utime(target, (member.mtime, member.mtime))
+
+def extract_store_members(backup_file, destination, tar, members):
+    """
+    Restore raw regular-file members of an uncompressed archive by copying their data
+    straight from the archive file descriptor, using the offsets tarfile already read.
+    """
+    src_fd = os.open(backup_file, os.O_RDONLY)
+    try:
+        for member in members:
+            target = prepare_target(destination, member.name)
+            with trace_span('zero_copy', 'file', TRACE_MIN_FILE_SPAN, path=member.name, bytes=member.size):
+                dst_fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                try:
+                    copy_member_data(src_fd, dst_fd, member.offset_data, member.size)
+                finally:
+                    os.close(dst_fd)
+            apply_member_metadata(tar, member, target)
+    finally:
+        os.close(src_fd)
+
+def extract_hard_link(tar, member, destination, name, linkname):
+    """
+    Restore a hard-link member as `name`, linked to the already restored `linkname`.
+    Falls back to a copy where linking is not possible (e.g. across file systems).
+    """
+    source = os.path.realpath(os.path.join(destination, linkname))
+    if not source.startswith(destination + os.sep):
+        raise ValueError(f"Refusing to link outside destination: {member.name}")
+    target = prepare_target(destination, name)
+    if not os.path.exists(source):
+        tar.extract(member, path=destination)
+        return
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+@traced
+def extract_backup(backup_file, destination, package_bundle=False):
+    """
+    Extract a backup archive into `destination`.
+    Members compressed individually by `create_backup` are decompressed back to
+    their original name; older whole-archive .tar.gz backups are handled too.
+    Raw files of an uncompressed archive are restored with zero-copy system calls.
+    Bundled package files are skipped, or with `package_bundle` extracted exclusively.
+    """
+    destination = os.path.realpath(destination)
+    with tarfile.open(backup_file, "r:*") as tar:
+        members = [m for m in tar.getmembers()
+                   if m.name.startswith(PACKAGE_BUNDLE_DIR + '/') == package_bundle]
+        dirs = [m for m in members if m.isdir()]
+        links = [m for m in members if m.islnk()]
+        files = [m for m in members if m.isreg()]
+        others = [m for m in members if not (m.isdir() or m.islnk() or m.isreg())]
+        compressed = [m for m in files if m.pax_headers.get(COMPRESSION_PAX_KEY) == 'gzip']
+        plain = [m for m in files if m.pax_headers.get(COMPRESSION_PAX_KEY) != 'gzip']
+        direct = []
+        if is_uncompressed_tar(backup_file):
+            direct = [m for m in plain if not m.issparse()]
+            plain = [m for m in plain if m.issparse()]
+
+        # Directories are created writable first and get their real modes last, so
+        # read-only directories can still be filled.
+        for member in dirs:
+            path = os.path.join(destination, member.name)
+            real = os.path.realpath(path)
+            if real != destination and not real.startswith(destination + os.sep):
+                raise ValueError(f"Refusing to extract outside destination: {member.name}")
+            os.makedirs(path, exist_ok=True)
+
+        # Regular files next, so hard links below can point at them.
+        extract_store_members(backup_file, destination, tar, direct)
+        for member in plain:
+            tar.extract(member, path=destination)
+        for member in compressed:
+            target = prepare_target(destination, member.name[:-len(COMPRESSION_SUFFIX)])
+            with tar.extractfile(member) as src, gzip.GzipFile(fileobj=src) as gz:
+                with open(target, 'wb') as dst:
+                    shutil.copyfileobj(gz, dst)
+            apply_member_metadata(tar, member, target)
+
+        for member in links:
+            if member.pax_headers.get(COMPRESSION_PAX_KEY) == 'gzip':
+                extract_hard_link(tar, member, destination, member.name[:-len(COMPRESSION_SUFFIX)],
+                                  member.linkname[:-len(COMPRESSION_SUFFIX)])
+            else:
+                extract_hard_link(tar, member, destination, member.name, member.linkname)
+        tar.extractall(path=destination, members=others)
+
+        # Deepest directories first, so setting a parent's mode never blocks a child.
+        for member in sorted(dirs, key=lambda m: m.name, reverse=True):
+            apply_member_metadata(tar, member, os.path.join(destination, member.name))
+
+def apply_deletions(destination, deleted):
+    """
+    Remove the paths an incremental backup recorded as deleted (relative to
+    `destination`). Returns the number of paths removed.
+    """
+    destination = os.path.realpath(destination)
+    removed = 0
+    for name in deleted:
+        path = os.path.join(destination, name)
+        parent = os.path.realpath(os.path.dirname(path))
+        if parent != destination and not parent.startswith(destination + os.sep):
+            continue
+        path = os.path.join(parent, os.path.basename(path))
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        elif os.path.lexists(path):
+            os.unlink(path)
+        else:
+            continue
+        removed += 1
+    return removed
+
+@traced
+def create_user_backups(users, apps_list, destination, background=False,
+                        bandwidth=MULTI_USER_BANDWIDTH, workers=MULTI_USER_WORKERS, store=False):
+    """
+    Back up the common files of every user in `users` (as returned by `get_user_homes`)
+    concurrently, one archive per user. All writers share a single `bandwidth` budget
+    so they do not thrash the target drive. Returns a list of (user, success, path_or_error).
+    With `background`, the budget is lowered and adapts to system load; see `create_backup`.
+    """
+    throttle = BackgroundThrottle(
+        io_rate=min(bandwidth, BACKGROUND_IO_LIMIT) if background else bandwidth,
+        compress_rate=BACKGROUND_COMPRESS_LIMIT if background else None,
+        adaptive=background
+    )
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    def backup_user(entry):
+        files = get_common_files(entry['home'])
+        success, result = create_backup(files, apps_list, destination, home=entry['home'],
+                                        user=entry['user'], throttle=throttle, store=store,
+                                        timestamp=timestamp)
+        return entry['user'], success, result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(users)))) as pool:
+        return list(pool.map(backup_user, users))
+
+def read_backup_manifest(backup_file):
+    """
+    Return the manifest stored in a backup archive.
+    """
+    with tarfile.open(backup_file, "r:*") as tar:
+        with tar.extractfile("manifest.json") as f:
+            return json.load(f)
+
+def restore_user_backup(backup_file):
+    """
+    Restore one per-user backup into that user's home directory on this system.
+    Returns (user, success, home_or_error).
+    """
+    user = None
+    try:
+        manifest = read_backup_manifest(backup_file)
+        user = manifest['user']
+        try:
+            home = pwd.getpwnam(user).pw_dir
+        except KeyError:
+            home = manifest['home']
+        extract_backup(backup_file, home)
+        os.remove(os.path.join(home, 'manifest.json'))
+        return user, True, home
+    except Exception as e:
+        return user or os.path.basename(backup_file), False, str(e)
+
+def group_user_backups(backup_files):
+    """
+    Group per-user backup file names by the export they belong to.
+    Returns {timestamp: [file names]}; all archives of one export share its timestamp.
+    """
+    exports = {}
+    prefix = f"migration_backup_{MULTI_USER_LABEL_PREFIX}"
+    for name in backup_files:
+        if name.startswith(prefix) and name.endswith('.tar'):
+            # migration_backup_user-<name>@<home>_<YYYYmmdd>_<HHMMSS>.tar
+            date, clock = name[:-len('.tar')].rsplit('_', 2)[1:]
+            exports.setdefault(f"{date}_{clock}", []).append(name)
+    return exports
+
+def restore_user_backups(backup_files, workers=MULTI_USER_WORKERS):
+    """
+    Restore several per-user backups in parallel. Returns a list of (user, success, home_or_error).
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(backup_files)))) as pool:
+        return list(pool.map(restore_user_backup, backup_files))
+
+def parse_package_list(package_manager, output):
+    """
+    Turn the output of an INSTALLED_QUERIES/AVAILABLE_QUERIES command into a set of names.
+    """
+    names = set()
+    for line in output.splitlines():
+        if package_manager == 'flatpak':
+            names.update(field.strip().lower() for field in line.split('\t') if field.strip())
+            continue
+        fields = line.split()
+        if package_manager == 'apt' and len(fields) == 2:
+            if fields[0] == 'ii':  # dpkg-query: keep only fully installed packages
+                names.add(fields[1])
+        elif fields:
+            names.add(fields[0])
+    return names
+
+@traced
+def get_installed_packages(package_manager):
+    """
+    Snapshot the packages installed through `package_manager` with a single query.
+    Returns a set of names, or None if it could not be queried.
+    """
+    try:
+        result = run_command(INSTALLED_QUERIES[package_manager], capture_output=True, text=True, check=True)
+        return parse_package_list(package_manager, result.stdout)
+    except (KeyError, OSError, subprocess.CalledProcessError):
+        return None
+
+@traced
+def get_available_packages(package_manager):
+    """
+    List every package `package_manager` can install with a single query.
+    Returns a set of names, or None if it could not be queried (the planner then
+    falls back to `check_package_exists` per app).
+    """
+    try:
+        result = run_command(AVAILABLE_QUERIES[package_manager], capture_output=True, text=True, check=True)
+        return parse_package_list(package_manager, result.stdout) or None
+    except (KeyError, OSError, subprocess.CalledProcessError):
+        return None
+
+def app_name_candidates(app):
+    """
+    Return the names an app from the manifest may be known by (with and without
+    a dnf/yum architecture suffix, and lowercased for Flatpak).
+    """
+    names = {app, strip_arch_suffix(app)}
+    return names | {name.lower() for name in names}
+
+@traced
+def plan_installation(apps_list, priority='native'):
+    """
+    Diff the manifest's apps against a bulk snapshot of what is installed here.
+    Returns a plan dict with 'install' (list of (app, package manager)), 'present'
+    and 'unresolvable' (lists of apps). `priority` is 'native' or 'flatpak'.
+    """
+    managers = detect_package_managers()
+    native_managers = [pm for pm in managers if pm != 'flatpak']
+    flatpak_managers = ['flatpak'] if 'flatpak' in managers else []
+    order = native_managers + flatpak_managers if priority == 'native' else flatpak_managers + native_managers
+
+    installed = set()
+    for pm in managers:
+        installed |= get_installed_packages(pm) or set()
+    available = {pm: get_available_packages(pm) for pm in order}
+
+    plan = {'install': [], 'present': [], 'unresolvable': []}
+    for app in apps_list:
+        names = app_name_candidates(app)
+        if names & installed:
+            plan['present'].append(app)
+            continue
+        for pm in order:
+            if available[pm] is not None:
+                found = bool(names & available[pm])
+            else:
+                found = check_package_exists(pm, app)
+            if found:
+                plan['install'].append((app, pm))
+                break
+        else:
+            plan['unresolvable'].append(app)
+    return plan
+
+@traced
 def check_package_exists(package_manager, app_name):
     """
     Check if the package manager can find the given application.
     """
     try:
         if package_manager == 'apt':
-            result = subprocess.run(['apt-cache', 'show', app_name], capture_output=True, text=True)
+            result = run_command(['apt-cache', 'show', app_name], capture_output=True, text=True)
             return result.returncode == 0 and bool(result.stdout.strip())
         elif package_manager in ['dnf', 'yum']:
-            result = subprocess.run([package_manager, 'info', app_name], capture_output=True)
+            result = run_command([package_manager, 'info', app_name], capture_output=True)
             return result.returncode == 0
         elif package_manager == 'pacman':
-            result = subprocess.run(['pacman', '-Si', app_name], capture_output=True)
+            result = run_command(['pacman', '-Si', app_name], capture_output=True)
             return result.returncode == 0
         elif package_manager == 'flatpak':
-            result = subprocess.run(['flatpak', 'search', app_name], capture_output=True, text=True)
+            result = run_command(['flatpak', 'search', app_name], capture_output=True, text=True)
             return app_name.lower() in result.stdout.lower()
         elif package_manager == 'zypper':
-            result = subprocess.run(['zypper', 'info', app_name], capture_output=True, text=True)
+            result = run_command(['zypper', 'info', app_name], capture_output=True, text=True)
             return result.returncode == 0
         return False
     except Exception:
         return False
 
+@traced
 def install_package(package_manager, app_name):
     """
     Install the application using the specified package manager.
     """
     try:
         if package_manager == 'apt':
-            subprocess.run(['sudo', 'apt', 'install', '-y', app_name], check=True)
+            run_command(['sudo', 'apt', 'install', '-y', app_name], check=True)
         elif package_manager in ['dnf', 'yum']:
-            subprocess.run(['sudo', package_manager, 'install', '-y', app_name], check=True)
+            run_command(['sudo', package_manager, 'install', '-y', app_name], check=True)
         elif package_manager == 'pacman':
-            subprocess.run(['sudo', 'pacman', '-S', '--noconfirm', app_name], check=True)
+            run_command(['sudo', 'pacman', '-S', '--noconfirm', app_name], check=True)
         elif package_manager == 'flatpak':
-            subprocess.run(['sudo', 'flatpak', 'install', '-y', 'flathub', app_name], check=True)
+            run_command(['sudo', 'flatpak', 'install', '-y', 'flathub', app_name], check=True)
         elif package_manager == 'zypper':
-            subprocess.run(['sudo', 'zypper', 'install', '-y', app_name], check=True)
+            run_command(['sudo', 'zypper', 'install', '-y', app_name], check=True)
         return True
     except subprocess.CalledProcessError:
         return False
 
+def journal_path(home, name):
+    """Return the path of a change-journal file for `home`."""
+    return os.path.join(home, JOURNAL_DIR, name)
+
+def load_json(path):
+    """Read a small JSON state file, returning None if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_json(path, data):
+    """Atomically replace a small JSON state file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def append_journal(home, entries):
+    """Append (op, path) entries to the change journal."""
+    path = journal_path(home, JOURNAL_LOG)
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+
+def watcher_alive(state):
+    """Return True if the watcher described by `state` is still running."""
+    try:
+        os.kill(state['pid'], 0)
+        return True
+    except (OSError, KeyError, TypeError):
+        return False
+
+def read_change_journal(selected_files, home=None):
+    """
+    Return the changes recorded since the last backup as a dict with 'changed' and
+    'deleted' path lists, the 'base' backup, the journal 'offset' and the 'watcher'
+    start time and 'overflows' count the journal was validated against, or None if the
+    journal cannot be trusted and a full rescan is needed: no watcher running, queue
+    overflow, missing watches, a damaged journal, no backup taken since the watcher
+    started, or a last backup made with a different file selection.
+    """
+    home = home or os.path.expanduser('~')
+    state = load_json(journal_path(home, WATCHER_STATE))
+    base = load_json(journal_path(home, JOURNAL_BASE))
+    if not state or not base or not watcher_alive(state) or not state.get('complete'):
+        return None
+    if base.get('watcher') != state.get('started') or base.get('overflows') != state.get('overflows'):
+        return None
+    # Changes outside the previous selection were dropped when the journal was reset.
+    if base.get('selection') != sorted(selected_files):
+        return None
+
+    latest = {}
+    try:
+        with open(journal_path(home, JOURNAL_LOG), 'rb') as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        for line in data.splitlines():
+            op, path = json.loads(line)
+            latest[path] = op
+    except (ValueError, TypeError):
+        return None
+    return {
+        'changed': [p for p, op in latest.items() if op == 'C'],
+        'deleted': [p for p, op in latest.items() if op == 'D'],
+        'base': base.get('backup'),
+        'offset': len(data),
+        'watcher': state.get('started'),
+        'overflows': state.get('overflows')
+    }
+
+def journal_checkpoint(home=None):
+    """
+    Capture the journal position before a backup starts, so that changes made while
+    the backup runs are kept. Returns None if no watcher is running.
+    """
+    home = home or os.path.expanduser('~')
+    state = load_json(journal_path(home, WATCHER_STATE))
+    if not state or not watcher_alive(state):
+        return None
+    try:
+        offset = os.path.getsize(journal_path(home, JOURNAL_LOG))
+    except OSError:
+        offset = 0
+    return {'watcher': state.get('started'), 'overflows': state.get('overflows'), 'offset': offset}
+
+def reset_change_journal(checkpoint, backup_path, selected_files, home=None):
+    """
+    After a successful backup of `selected_files`, drop the journal entries up to
+    `checkpoint` and make the journal relative to `backup_path`.
+    """
+    if checkpoint is None:
+        return
+    home = home or os.path.expanduser('~')
+    try:
+        with open(journal_path(home, JOURNAL_LOG), 'r+b') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(checkpoint['offset'])
+            remaining = f.read()
+            f.seek(0)
+            f.write(remaining)
+            f.truncate()
+    except OSError:
+        return
+    save_json(journal_path(home, JOURNAL_BASE), {
+        'backup': os.path.basename(backup_path),
+        'watcher': checkpoint['watcher'],
+        'overflows': checkpoint['overflows'],
+        'selection': sorted(selected_files)
+    })
+
+def watch_changes(home=None):
+    """
+    Watch the common files of `home` with inotify and keep a persistent change journal,
+    so exports can archive only what changed. Runs until interrupted. If the kernel
+    queue overflows the journal is marked untrusted, and the next export falls back
+    to a full rescan.
+    """
+    home = home or os.path.expanduser('~')
+    roots = [os.path.join(home, f) for f in COMMON_FILES]
+    libc = ctypes.CDLL(None, use_errno=True)
+    fd = libc.inotify_init1(os.O_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    state = {'pid': os.getpid(), 'started': datetime.now().isoformat(), 'overflows': 0, 'complete': True}
+    watches = {}
+
+    def add_watch(directory):
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            # Usually ENOSPC: fs.inotify.max_user_watches is exhausted.
+            if ctypes.get_errno() != errno.ENOENT:
+                state['complete'] = False
+            return
+        watches[wd] = directory
+
+    def add_tree(directory, entries=None):
+        """Watch a directory tree; record its contents when it appeared after startup."""
+        for root, dirs, files in os.walk(directory):
+            add_watch(root)
+            if entries is not None:
+                entries.extend(('C', os.path.join(root, name)) for name in dirs + files)
+
+    # The home directory itself is watched (non-recursively) for the top-level files
+    # and for common directories created later.
+    add_watch(home)
+    for root in roots:
+        if os.path.isdir(root) and not os.path.islink(root):
+            add_tree(root)
+    os.makedirs(os.path.join(home, JOURNAL_DIR), exist_ok=True)
+    open(journal_path(home, JOURNAL_LOG), 'w').close()
+    save_json(journal_path(home, WATCHER_STATE), state)
+    print(f"Watching {len(watches)} directories under {home} (Ctrl+C to stop).")
+    if not state['complete']:
+        print("Warning: not every directory could be watched; exports will do a full rescan.")
+    saved_complete = state['complete']
+
+    try:
+        while True:
+            data = os.read(fd, 64 * 1024)
+            entries = []
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b'\0')
+                offset += INOTIFY_EVENT.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    state['overflows'] += 1
+                    save_json(journal_path(home, WATCHER_STATE), state)
+                    continue
+                if mask & IN_IGNORED:
+                    watches.pop(wd, None)
+                    continue
+                directory = watches.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if not is_within(path, roots):
+                    continue
+
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    entries.append(('D', path))
+                    if mask & IN_ISDIR:
+                        # A moved-away tree keeps its watches; stop attributing events to it.
+                        for stale in [w for w, d in watches.items() if is_within(d, [path])]:
+                            libc.inotify_rm_watch(fd, stale)
+                            watches.pop(stale, None)
+                else:
+                    entries.append(('C', path))
+                    if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        add_tree(path, entries)
+            if entries:
+                append_journal(home, entries)
+            if state['complete'] != saved_complete:
+                save_json(journal_path(home, WATCHER_STATE), state)
+                saved_complete = state['complete']
+    except KeyboardInterrupt:
+        print("\nWatcher stopped.")
+    finally:
+        os.close(fd)
+
 def export_flow():
     """Handles the backup/export flow."""
     clear_screen()
@@ -242,23 +1568,38 @@ def export_flow():
         input("Invalid selection! Press Enter to return.")
         return
 
-    default_files = get_common_files()
-    if default_files:
+    users = None
+    if os.geteuid() == 0:
+        all_users = input("\nBack up all user home directories concurrently? [y/N]: ").strip().lower()
+        if all_users in ["y", "yes"]:
+            users = get_user_homes()
+            if not users:
+                input("No user home directories found! Press Enter to return.")
+                return
+            print("\nUsers to back up:")
+            for entry in users:
+                print(f"- {entry['user']} ({entry['home']})")
+
+    default_files = [] if users else get_common_files()
+    if users:
+        selected_files = []
+    elif default_files:
         print("\nRecommended files/directories:")
         for f in default_files:
             print(f"- {os.path.basename(f)}")
     else:
         print("\nNo recommended files found.")
     
-    use_recommended = input("\nUse recommended files? [Y/n]: ").strip().lower()
-    if use_recommended in ["", "y", "yes"]:
-        selected_files = default_files
-    else:
-        selected_files = []
-        for file in default_files:
-            choice = input(f"Include {os.path.basename(file)}? [Y/n]: ").strip().lower()
-            if choice in ["", "y", "yes"]:
-                selected_files.append(file)
+    if not users:
+        use_recommended = input("\nUse recommended files? [Y/n]: ").strip().lower()
+        if use_recommended in ["", "y", "yes"]:
+            selected_files = default_files
+        else:
+            selected_files = []
+            for file in default_files:
+                choice = input(f"Include {os.path.basename(file)}? [Y/n]: ").strip().lower()
+                if choice in ["", "y", "yes"]:
+                    selected_files.append(file)
 
     apps = get_installed_apps()
     print(f"\nFound {len(apps)} installed applications.")
@@ -273,8 +1614,23 @@ def export_flow():
             if choice in ["", "y", "yes"]:
                 selected_apps.append(app)
 
+    changes = None
+    if not users:
+        changes = read_change_journal(selected_files)
+        if changes:
+            print(f"\nChange journal: {len(changes['changed'])} changed and {len(changes['deleted'])} "
+                  f"deleted path(s) since {changes['base']}.")
+            choice = input("Back up only the changes (incremental)? [Y/n]: ").strip().lower()
+            if choice not in ["", "y", "yes"]:
+                changes = None
+
     print("\n=== Summary ===")
-    print(f"Files to backup: {len(selected_files)} item(s)")
+    if users:
+        print(f"User homes to backup: {len(users)} (one archive per user)")
+    else:
+        print(f"Files to backup: {len(selected_files)} item(s)")
+    if changes:
+        print(f"Incremental: only changes since {changes['base']}")
     print(f"Applications to backup: {len(selected_apps)} item(s)")
     print(f"Destination USB: {selected['mount']}")
     
@@ -282,9 +1638,53 @@ def export_flow():
     if proceed not in ["", "y", "yes"]:
         return
 
+    background = input("Run in background mode (low priority, throttled)? [y/N]: ").strip().lower()
+    background = background in ["y", "yes"]
+
+    store = input("Skip compression (faster on fast drives, larger backup)? [y/N]: ").strip().lower()
+    store = store in ["y", "yes"]
+
+    bundle_packages = False
+    if not users and selected_apps:
+        choice = input("Bundle cached package files for offline reinstall? [y/N]: ").strip().lower()
+        bundle_packages = choice in ["y", "yes"]
+
     print("\nCreating backup, please wait...")
-    success, backup_path = create_backup(selected_files, selected_apps, selected['mount'])
+    if background:
+        print("Running in a low-priority background process.")
+        run = run_in_background
+    else:
+        run = lambda func, *args, **kwargs: func(*args, **kwargs)
+
+    if users:
+        try:
+            results = run(create_user_backups, users, selected_apps, selected['mount'], background, store=store)
+        except RuntimeError as e:
+            results = [(entry['user'], False, str(e)) for entry in users]
+        for user, success, result in results:
+            if success:
+                print(f"✅ {user}: {result}")
+            else:
+                print(f"❌ {user}: {result}")
+        input("\nPress Enter to return to the main menu.")
+        return
+
+    checkpoint = journal_checkpoint()
+    if changes:
+        if not checkpoint or (checkpoint['watcher'], checkpoint['overflows']) != (changes['watcher'], changes['overflows']):
+            # The watcher restarted or lost events while the prompts were open.
+            print("Change journal is no longer reliable; doing a full backup instead.")
+            changes = None
+        else:
+            # Checkpoint exactly what was read: later entries must survive the reset.
+            checkpoint = {key: changes[key] for key in ('watcher', 'overflows', 'offset')}
+    try:
+        success, backup_path = run(create_backup, selected_files, selected_apps, selected['mount'], background,
+                                   bundle_packages=bundle_packages, store=store, changes=changes)
+    except RuntimeError as e:
+        success, backup_path = False, str(e)
     if success:
+        reset_change_journal(checkpoint, backup_path, selected_files)
         print(f"\n✅ Backup created successfully: {backup_path}")
     else:
         print(f"\n❌ Error creating backup: {backup_path}")
@@ -317,7 +1717,7 @@ def import_flow():
     try:
         backup_files = [
             f for f in os.listdir(selected['mount'])
-            if f.startswith('migration_backup') and f.endswith('.tar.gz')
+            if f.startswith('migration_backup') and f.endswith(('.tar', '.tar.gz'))
         ]
     except Exception as e:
         input(f"Error accessing drive: {e}\nPress Enter to return.")
@@ -327,97 +1727,145 @@ def import_flow():
         input("No backup files found on the selected USB drive! Press Enter to return.")
         return
 
-    print("\nAvailable Backups:")
-    for idx, file in enumerate(backup_files, 1):
-        print(f"{idx}. {file}")
-    
-    try:
-        selection = int(input("\nSelect backup (number): "))
-        if selection < 1 or selection > len(backup_files):
-            raise ValueError
-        backup_file = os.path.join(selected['mount'], backup_files[selection - 1])
-    except ValueError:
-        input("Invalid selection! Press Enter to return.")
-        return
+    user_exports = group_user_backups(backup_files)
+    user_backups = []
+    restore_all_users = False
+    if user_exports and os.geteuid() == 0:
+        choice = input("Restore all per-user backups to their home directories? [y/N]: ").strip().lower()
+        restore_all_users = choice in ["y", "yes"]
 
-    print("\nRestoring files...")
-    try:
-        with tarfile.open(backup_file, "r:gz") as tar:
-            tar.extractall(path=os.path.expanduser('~'))
-        print("Files restored successfully!")
-    except Exception as e:
-        print(f"Error restoring files: {e}")
-    
-    # Application reinstallation
-    print("\n=== Application Reinstallation ===")
-    manifest_path = os.path.join(os.path.expanduser('~'), 'manifest.json')
-    try:
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
-        apps_list = manifest.get('apps', [])
-        os.remove(manifest_path)  # Clean up the extracted manifest
-    except Exception as e:
-        print(f"Error reading manifest: {e}")
-        apps_list = []
+    if restore_all_users:
+        # Only one export may be restored at a time, or archives of the same user would race.
+        timestamps = sorted(user_exports, reverse=True)
+        timestamp = timestamps[0]
+        if len(timestamps) > 1:
+            print("\nMulti-user exports on this drive:")
+            for idx, ts in enumerate(timestamps, 1):
+                print(f"{idx}. {ts} ({len(user_exports[ts])} user(s))")
+            try:
+                selection = input("\nSelect export (number, Enter for latest): ").strip()
+                if selection:
+                    selection = int(selection)
+                    if selection < 1 or selection > len(timestamps):
+                        raise ValueError
+                    timestamp = timestamps[selection - 1]
+            except ValueError:
+                input("Invalid selection! Press Enter to return.")
+                return
+        user_backups = [os.path.join(selected['mount'], f) for f in sorted(user_exports[timestamp])]
 
-    if apps_list:
-        managers = detect_package_managers()
-        native_managers = [pm for pm in managers if pm != 'flatpak']
-        flatpak_available = 'flatpak' in managers
+    if restore_all_users:
+        print("\nRestoring user homes in parallel...")
+        for user, success, result in restore_user_backups(user_backups):
+            if success:
+                print(f"✅ {user}: restored to {result}")
+            else:
+                print(f"❌ {user}: {result}")
+        # All per-user archives of one export carry the same application list.
+        print("\n=== Application Reinstallation ===")
+        bundle = None
+        try:
+            apps_list = read_backup_manifest(user_backups[0]).get('apps', [])
+        except Exception as e:
+            print(f"Error reading manifest: {e}")
+            apps_list = []
+    else:
+        print("\nAvailable Backups:")
+        for idx, file in enumerate(backup_files, 1):
+            print(f"{idx}. {file}")
+        
+        try:
+            selection = int(input("\nSelect backup (number): "))
+            if selection < 1 or selection > len(backup_files):
+                raise ValueError
+            backup_file = os.path.join(selected['mount'], backup_files[selection - 1])
+        except ValueError:
+            input("Invalid selection! Press Enter to return.")
+            return
 
+        print("\nRestoring files...")
+        try:
+            extract_backup(backup_file, os.path.expanduser('~'))
+            print("Files restored successfully!")
+        except Exception as e:
+            print(f"Error restoring files: {e}")
+        
+        # Application reinstallation
+        print("\n=== Application Reinstallation ===")
+        manifest_path = os.path.join(os.path.expanduser('~'), 'manifest.json')
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            apps_list = manifest.get('apps', [])
+            bundle = manifest.get('package_bundle')
+            deleted = manifest.get('incremental', {}).get('deleted', [])
+            if deleted:
+                removed = apply_deletions(os.path.expanduser('~'), deleted)
+                print(f"Removed {removed} path(s) deleted since {manifest['incremental']['base']}.")
+            os.remove(manifest_path)  # Clean up the extracted manifest
+        except Exception as e:
+            print(f"Error reading manifest: {e}")
+            apps_list = []
+            bundle = None
+
+    total_apps = len(apps_list)
+    bundled_apps = []
+    if bundle and apps_list and bundle['package_manager'] in detect_package_managers():
+        choice = input(f"\nInstall {len(bundle['packages'])} bundled packages from the backup first? [Y/n]: ").strip().lower()
+        if choice in ["", "y", "yes"]:
+            print("Installing bundled packages from local media...")
+            bundled_apps = install_bundled_packages(backup_file, bundle)
+            if bundled_apps:
+                print(f"Installed {len(bundled_apps)} packages from the backup.")
+            else:
+                print("Installing bundled packages failed; falling back to repositories.")
+            installed = set(bundled_apps)
+            apps_list = [app for app in apps_list
+                         if app not in installed and strip_arch_suffix(app) not in installed]
+
+    if apps_list:
         print("\nChoose installation priority:")
         print("1. Native packages (system package manager)")
         print("2. Flatpak packages")
         choice = input("Enter your choice (1/2): ").strip()
         priority = 'native' if choice == '1' else 'flatpak'
 
-        success_count = 0
-        failed_apps = []
-        for app in apps_list:
-            installed = False
-            print(f"\nAttempting to install: {app}")
-            if priority == 'native':
-                for pm in native_managers:
-                    if check_package_exists(pm, app):
-                        print(f"Found in {pm}. Installing...")
-                        if install_package(pm, app):
-                            success_count += 1
-                            installed = True
-                            break
-                if not installed and flatpak_available:
-                    if check_package_exists('flatpak', app):
-                        print("Found in Flatpak. Installing...")
-                        if install_package('flatpak', app):
-                            success_count += 1
-                            installed = True
+        print("\nComparing the backup with the installed packages...")
+        plan = plan_installation(apps_list, priority)
+
+        print("\n=== Installation Plan ===")
+        print(f"Already installed: {len(plan['present'])}")
+        print(f"To install: {len(plan['install'])}")
+        for app, pm in plan['install']:
+            print(f"- {app} ({pm})")
+        print(f"Not found in any repository: {len(plan['unresolvable'])}")
+        for app in plan['unresolvable']:
+            print(f"- {app}")
+
+        proceed = input("\nProceed with installation? [Y/n]: ").strip().lower()
+        if proceed not in ["", "y", "yes"]:
+            input("\nPress Enter to return to the main menu.")
+            return
+
+        success_count = len(bundled_apps)
+        failed_apps = list(plan['unresolvable'])
+        for app, pm in plan['install']:
+            print(f"\nInstalling {app} from {pm}...")
+            if install_package(pm, app):
+                success_count += 1
             else:
-                if flatpak_available:
-                    if check_package_exists('flatpak', app):
-                        print("Found in Flatpak. Installing...")
-                        if install_package('flatpak', app):
-                            success_count += 1
-                            installed = True
-                if not installed:
-                    for pm in native_managers:
-                        if check_package_exists(pm, app):
-                            print(f"Found in {pm}. Installing...")
-                            if install_package(pm, app):
-                                success_count += 1
-                                installed = True
-                                break
-            
-            if not installed:
                 failed_apps.append(app)
                 print(f"Failed to install {app}")
 
         print("\n=== Installation Summary ===")
-        print(f"Successfully installed: {success_count} out of {len(apps_list)}")
+        print(f"Already installed: {len(plan['present'])}")
+        print(f"Successfully installed: {success_count} out of {total_apps - len(plan['present'])}")
         if failed_apps:
             print("\nFailed installations:")
             for app in failed_apps:
                 print(f"- {app}")
             print("\nNote: Some application names might differ in repositories.")
-    else:
+    elif not bundled_apps:
         print("\nNo applications to reinstall based on the backup manifest.")
 
     input("\nPress Enter to return to the main menu.")
@@ -430,11 +1878,27 @@ def show_help():
 
     Export Backup:
       - Creates a backup of your selected files/directories and a list of installed applications.
-      - The backup is saved as a compressed tar.gz file on a connected USB drive.
+      - The backup is saved as a tar file on a connected USB drive.
+      - Files are compressed individually; photos, music and archives are stored as-is.
+      - Skipping compression makes export faster and lets restore copy files at near device speed.
+      - When run as root, all user home directories can be backed up concurrently,
+        one archive per user, with ownership preserved.
+      - Cached package files (apt, pacman, dnf/yum, zypper) can be bundled so a
+        same-distro restore reinstalls them from the USB drive without downloading.
+      - Run `linux_migration_tool.py --watch` in the background to keep a change journal;
+        later exports can then back up only what changed, without rescanning.
+        Restore the full backup first, then the incremental ones in order.
+      - Background mode lowers CPU/I/O priority and slows down when the system is busy.
+
+    Troubleshooting slow migrations:
+      - Set DISTROHOP_TRACE=/path/trace.json to record a timeline of every phase and command
+        (open it in chrome://tracing or ui.perfetto.dev).
+      - Add DISTROHOP_PROFILE=<phase>, e.g. create_backup, to also write a cProfile dump.
     
     Import Restore:
       - Restores files from a selected backup archive to your home directory.
       - Reinstalls applications listed in the backup manifest using available package managers.
+      - Shows a plan first; applications already installed on this system are skipped.
     
     Make sure you have a USB drive connected and mounted.
     """
@@ -464,5 +1928,8 @@ def main_menu():
             input("⚠️ Invalid option! Press Enter to try again.")
 
 if __name__ == "__main__":
-    main_menu()
+    if sys.argv[1:] == ['--watch']:
+        watch_changes()
+    else:
+        main_menu()
 